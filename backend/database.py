@@ -3,33 +3,57 @@ Database configuration for the RSVP system.
 Uses SQLite for simplicity - easy to deploy and no external dependencies.
 """
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import asyncio
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 # SQLite database file - stored in backend directory
-SQLALCHEMY_DATABASE_URL = "sqlite:///./rsvp_system.db"
+SQLALCHEMY_DATABASE_URL = "sqlite+aiosqlite:///./rsvp_system.db"
 
-# Create engine with SQLite-specific settings
-engine = create_engine(
+# Async engine so database I/O never blocks the event loop
+engine = create_async_engine(
     SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False}  # Required for SQLite
+    poolclass=AsyncAdaptedQueuePool,  # aiosqlite defaults to NullPool
+    pool_size=10,
+    max_overflow=20,
 )
 
-# Session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+@event.listens_for(engine.sync_engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+    """
+    Tune SQLite for concurrent use on every new connection:
+    - WAL journal lets readers proceed while a write is in progress
+    - synchronous=NORMAL skips the per-commit fsync WAL doesn't need
+    - memory temp store / mmap / larger cache reduce disk traffic
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+# Session factory - expire_on_commit=False keeps objects usable after commit
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 # Base class for ORM models
 Base = declarative_base()
 
+# SQLite allows one writer at a time; serializing writes here instead of
+# letting them collide avoids "database is locked" retry storms under
+# load. Reads run in parallel thanks to WAL and never take this lock.
+WRITE_LOCK = asyncio.Lock()
+
 
-def get_db():
+async def get_db():
     """
     Dependency that provides a database session.
     Automatically closes session when request is complete.
     """
-    db = SessionLocal()
-    try:
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
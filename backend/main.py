@@ -13,28 +13,29 @@ Features:
 
 from fastapi import FastAPI, Depends, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import engine, get_db, Base
+from database import engine, get_db, Base, WRITE_LOCK
 from models import Player
 from schemas import (
-    RSVPRequest, 
+    RSVPRequest,
     PaymentRequest,
-    PlayerResponse, 
-    PlayerListResponse, 
+    PlayerResponse,
+    PlayerListResponse,
     MessageResponse,
     ErrorResponse
 )
 from services import rsvp_service, checkin_service, export_service
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title="Pickup Soccer RSVP System",
     description="RSVP and Check-in system for pickup soccer games",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse  # C-speed JSON, native datetimes
 )
 
 # Configure CORS for React frontend
@@ -47,10 +48,84 @@ app.add_middleware(
 )
 
 
+# Compiled serializer for the GET /players payload - one pydantic-core
+# pass over the whole tree instead of FastAPI's jsonable_encoder walk
+_PLAYER_LIST_JSON = TypeAdapter(PlayerListResponse)
+
+# Cache for the GET /players payload. Any write bumps "version"; the
+# cached response is reused until versions diverge, so repeated polls of
+# an unchanged roster skip the queries entirely. Single-process only -
+# matches the embedded SQLite deployment. No lock needed: handlers all
+# run on one event loop, and the worst race is one redundant rebuild.
+_players_cache = {"version": 0, "built_version": -1, "response": None}
+
+
+def _invalidate_players_cache():
+    """Mark the cached GET /players response stale after a write"""
+    _players_cache["version"] += 1
+
+
+def _to_resp(player: Player) -> PlayerResponse:
+    """
+    Build a PlayerResponse without validation - the data comes straight
+    from our own ORM rows and is already correctly typed, so per-field
+    coercion is pure overhead on the hot list endpoint.
+    """
+    return PlayerResponse.model_construct(
+        id=player.id,
+        name=player.name,
+        rsvp_status=player.rsvp_status,
+        rsvp_timestamp=player.rsvp_timestamp,
+        waitlist_position=player.waitlist_position,
+        paid=player.paid,
+        checked_in=player.checked_in,
+        is_confirmed=player.is_confirmed,
+        is_waitlisted=player.is_waitlisted,
+    )
+
+
+# One-time guard so repeated startup events (e.g. app remounted under a
+# parent ASGI app, or test re-entry) don't re-issue the per-table
+# existence checks create_all performs
+_tables_created = False
+
+
+@app.on_event("startup")
+async def create_tables():
+    """Create database tables on first startup (async engine requires a running loop)"""
+    global _tables_created
+    if _tables_created:
+        return
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+        # create_all never alters existing tables, so databases created
+        # before the name_lower column need a one-time backfill
+        columns = (await conn.exec_driver_sql("PRAGMA table_info(players)")).fetchall()
+        if not any(column[1] == "name_lower" for column in columns):
+            # SQLite can't add a NOT NULL column without a default;
+            # nullable here is fine - every row is backfilled below and
+            # the application always writes the column
+            await conn.exec_driver_sql("ALTER TABLE players ADD COLUMN name_lower VARCHAR(100)")
+            await conn.exec_driver_sql("UPDATE players SET name_lower = lower(name)")
+            await conn.exec_driver_sql(
+                "CREATE UNIQUE INDEX IF NOT EXISTS ix_players_name_lower ON players (name_lower)"
+            )
+
+        # Same story for indexes added after a table already existed:
+        # create_all won't touch it, so ensure the composite index the
+        # hot status/waitlist filters rely on
+        await conn.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS ix_players_status_waitlist"
+            " ON players (rsvp_status, waitlist_position)"
+        )
+    _tables_created = True
+
+
 # ============== Health Check ==============
 
 @app.get("/", tags=["Health"])
-def root():
+async def root():
     """Health check endpoint"""
     return {"status": "healthy", "message": "Pickup Soccer RSVP System is running!"}
 
@@ -58,54 +133,72 @@ def root():
 # ============== Player Endpoints ==============
 
 @app.get("/players", response_model=PlayerListResponse, tags=["Players"])
-def get_all_players(db: Session = Depends(get_db)):
+async def get_all_players(db: AsyncSession = Depends(get_db)):
     """
     Get all players categorized by status.
-    
+
     Returns confirmed players (max 22), waitlist, and OUT players.
+    The payload is encoded once by the compiled pydantic-core serializer
+    and cached as bytes, bypassing FastAPI's per-response encoder.
     """
-    result = rsvp_service.get_all_players_categorized(db)
-    return PlayerListResponse(
-        confirmed=[PlayerResponse.model_validate(p) for p in result["confirmed"]],
-        waitlist=[PlayerResponse.model_validate(p) for p in result["waitlist"]],
-        out=[PlayerResponse.model_validate(p) for p in result["out"]],
+    if _players_cache["built_version"] == _players_cache["version"]:
+        return Response(content=_players_cache["response"], media_type="application/json")
+
+    version = _players_cache["version"]
+    result = await rsvp_service.get_all_players_categorized(db)
+    response = PlayerListResponse(
+        confirmed=[_to_resp(p) for p in result["confirmed"]],
+        waitlist=[_to_resp(p) for p in result["waitlist"]],
+        out=[_to_resp(p) for p in result["out"]],
         total_confirmed=result["total_confirmed"],
         total_waitlist=result["total_waitlist"],
         spots_available=result["spots_available"]
     )
+    payload = _PLAYER_LIST_JSON.dump_json(response)
+    _players_cache["response"] = payload
+    _players_cache["built_version"] = version
+    return Response(content=payload, media_type="application/json")
 
 
 @app.get("/players/{player_id}", response_model=PlayerResponse, tags=["Players"])
-def get_player(player_id: int, db: Session = Depends(get_db)):
+async def get_player(player_id: int, db: AsyncSession = Depends(get_db)):
     """Get a single player by ID"""
-    player = rsvp_service.get_player_by_id(db, player_id)
+    player = await rsvp_service.get_player_by_id(db, player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    return PlayerResponse.model_validate(player)
+    # Waitlisted players carry a sparse stored marker; serialize the
+    # derived rank instead, consistent with GET /players
+    await rsvp_service.overlay_waitlist_rank(db, player)
+    return _to_resp(player)
 
 
 # ============== RSVP Endpoints ==============
 
 @app.post("/players/rsvp", response_model=MessageResponse, tags=["RSVP"])
-def rsvp_player(request: RSVPRequest, db: Session = Depends(get_db)):
+async def rsvp_player(request: RSVPRequest, db: AsyncSession = Depends(get_db)):
     """
     RSVP a player IN or OUT.
-    
+
     Rules:
     - First 22 players are confirmed IN
     - Additional players go to timestamp-ordered waitlist
     - Going OUT promotes next waitlisted player
     """
     try:
-        if request.status == "IN":
-            player, message = rsvp_service.rsvp_in(db, request.name)
-        else:
-            player, message = rsvp_service.rsvp_out(db, request.name)
-        
+        async with WRITE_LOCK:
+            if request.status == "IN":
+                player, message = await rsvp_service.rsvp_in(db, request.name)
+            else:
+                player, message = await rsvp_service.rsvp_out(db, request.name)
+
+        # player is None only for no-op duplicates - nothing changed, so
+        # the roster cache stays valid and there is no player to echo
+        if player is not None:
+            _invalidate_players_cache()
         return MessageResponse(
             success=True,
             message=message,
-            player=PlayerResponse.model_validate(player) if player else None
+            player=_to_resp(player) if player else None
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -114,89 +207,99 @@ def rsvp_player(request: RSVPRequest, db: Session = Depends(get_db)):
 # ============== Payment Endpoints ==============
 
 @app.put("/players/{player_id}/pay", response_model=MessageResponse, tags=["Payment"])
-def mark_player_paid(player_id: int, request: PaymentRequest, db: Session = Depends(get_db)):
+async def mark_player_paid(player_id: int, request: PaymentRequest, db: AsyncSession = Depends(get_db)):
     """
     Mark a player as paid or unpaid.
-    
+
     Payment is required before check-in on game day.
     """
-    player = rsvp_service.get_player_by_id(db, player_id)
-    
+    player = await rsvp_service.get_player_by_id(db, player_id)
+
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    
+
     if player.rsvp_status != "IN":
         raise HTTPException(status_code=400, detail="Can only mark payment for players who are IN")
-    
-    player.paid = request.paid
-    db.commit()
-    db.refresh(player)
-    
+
+    async with WRITE_LOCK:
+        player.paid = request.paid
+        await db.commit()
+    _invalidate_players_cache()
+
+    # Waitlisted players can be marked paid too - echo their derived rank
+    await rsvp_service.overlay_waitlist_rank(db, player)
+
     status = "paid" if request.paid else "unpaid"
     return MessageResponse(
         success=True,
         message=f"{player.name} marked as {status}",
-        player=PlayerResponse.model_validate(player)
+        player=_to_resp(player)
     )
 
 
 # ============== Check-in Endpoints ==============
 
 @app.put("/players/{player_id}/checkin", response_model=MessageResponse, tags=["Check-in"])
-def check_in_player(player_id: int, db: Session = Depends(get_db)):
+async def check_in_player(player_id: int, db: AsyncSession = Depends(get_db)):
     """
     Check in a player on game day.
-    
+
     Rules:
     - Player must be RSVP'd IN
     - Player must NOT be on waitlist
     - Player must have PAID
     """
     try:
-        player, message = checkin_service.check_in_player(db, player_id)
+        async with WRITE_LOCK:
+            player, message = await checkin_service.check_in_player(db, player_id)
+        _invalidate_players_cache()
         return MessageResponse(
             success=True,
             message=message,
-            player=PlayerResponse.model_validate(player)
+            player=_to_resp(player)
         )
     except checkin_service.CheckInError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.put("/players/{player_id}/undo-checkin", response_model=MessageResponse, tags=["Check-in"])
-def undo_check_in(player_id: int, db: Session = Depends(get_db)):
+async def undo_check_in(player_id: int, db: AsyncSession = Depends(get_db)):
     """Undo a player's check-in (admin function)"""
     try:
-        player, message = checkin_service.undo_check_in(db, player_id)
+        async with WRITE_LOCK:
+            player, message = await checkin_service.undo_check_in(db, player_id)
+        _invalidate_players_cache()
         return MessageResponse(
             success=True,
             message=message,
-            player=PlayerResponse.model_validate(player)
+            player=_to_resp(player)
         )
     except checkin_service.CheckInError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/checkin/stats", tags=["Check-in"])
-def get_checkin_stats(db: Session = Depends(get_db)):
+async def get_checkin_stats(db: AsyncSession = Depends(get_db)):
     """Get check-in statistics for game day"""
-    return checkin_service.get_check_in_stats(db)
+    return await checkin_service.get_check_in_stats(db)
 
 
 # ============== Export Endpoints ==============
 
 @app.get("/export/csv", tags=["Export"])
-def export_csv(db: Session = Depends(get_db)):
+async def export_csv():
     """
     Export all players to CSV file.
-    
+
     Includes timestamps, status, payment, and check-in information.
+    Rows are streamed so the export never buffers the full table.
+    The generator opens its own session - a request-scoped one would be
+    torn down before the body streams.
     """
-    csv_bytes = export_service.export_players_to_csv_bytes(db)
     filename = export_service.get_export_filename()
-    
-    return Response(
-        content=csv_bytes,
+
+    return StreamingResponse(
+        export_service.iter_players_csv(),
         media_type="text/csv",
         headers={
             "Content-Disposition": f"attachment; filename={filename}"
@@ -207,28 +310,30 @@ def export_csv(db: Session = Depends(get_db)):
 # ============== Admin Endpoints ==============
 
 @app.delete("/players/{player_id}", response_model=MessageResponse, tags=["Admin"])
-def delete_player(player_id: int, db: Session = Depends(get_db)):
+async def delete_player(player_id: int, db: AsyncSession = Depends(get_db)):
     """Delete a player completely (admin function)"""
-    player = rsvp_service.get_player_by_id(db, player_id)
-    
+    player = await rsvp_service.get_player_by_id(db, player_id)
+
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
-    
+
     was_confirmed = player.is_confirmed
     player_name = player.name
-    
-    db.delete(player)
-    db.commit()
-    
-    # Promote from waitlist if needed
-    if was_confirmed:
-        promoted = rsvp_service.promote_from_waitlist(db)
-        if promoted:
-            return MessageResponse(
-                success=True,
-                message=f"Deleted {player_name}. {promoted.name} promoted from waitlist!"
-            )
-    
+
+    # Delete and promote in one transaction - a single commit instead of
+    # one per step
+    async with WRITE_LOCK:
+        await db.delete(player)
+        promoted = await rsvp_service.promote_from_waitlist(db) if was_confirmed else None
+        await db.commit()
+    _invalidate_players_cache()
+
+    if promoted:
+        return MessageResponse(
+            success=True,
+            message=f"Deleted {player_name}. {promoted.name} promoted from waitlist!"
+        )
+
     return MessageResponse(
         success=True,
         message=f"Deleted {player_name}"
@@ -236,11 +341,16 @@ def delete_player(player_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/admin/reset", response_model=MessageResponse, tags=["Admin"])
-def reset_all_data(db: Session = Depends(get_db)):
+async def reset_all_data(db: AsyncSession = Depends(get_db)):
     """Reset all player data (admin function - use with caution!)"""
-    db.query(Player).delete()
-    db.commit()
-    
+    async with WRITE_LOCK:
+        # Core delete with no WHERE compiles to a bare DELETE FROM, which
+        # SQLite handles with its truncate optimization - one statement,
+        # no per-row ORM bookkeeping
+        await db.execute(delete(Player))
+        await db.commit()
+    _invalidate_players_cache()
+
     return MessageResponse(
         success=True,
         message="All player data has been reset"
@@ -2,7 +2,7 @@
 SQLAlchemy ORM models for the RSVP system.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -21,14 +21,20 @@ class Player(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False, unique=True)
-    
+
+    # Lowercased copy of name so case-insensitive lookups hit a plain
+    # b-tree index instead of evaluating lower() per row
+    name_lower = Column(String(100), nullable=False, unique=True, index=True)
+
     # RSVP status: "IN" or "OUT"
     rsvp_status = Column(String(10), default="OUT", nullable=False)
     
     # Timestamp when RSVP was submitted (for waitlist ordering)
     rsvp_timestamp = Column(DateTime(timezone=True), server_default=func.now())
     
-    # Waitlist position: None = confirmed IN (within 22), 1+ = waitlist position
+    # Waitlist marker: None = confirmed IN (within 22), non-NULL = waitlisted.
+    # The stored value is a sparse insertion marker; display positions are
+    # computed on read from rsvp_timestamp order (no renumbering on promote).
     waitlist_position = Column(Integer, nullable=True, default=None)
     
     # Payment status
@@ -37,6 +43,12 @@ class Player(Base):
     # Check-in status (game day)
     checked_in = Column(Boolean, default=False, nullable=False)
 
+    __table_args__ = (
+        # Covers the hot filters on rsvp_status + waitlist_position
+        # (confirmed count, waitlist ordering, check-in stats)
+        Index("ix_players_status_waitlist", "rsvp_status", "waitlist_position"),
+    )
+
     def __repr__(self):
         return f"<Player(id={self.id}, name='{self.name}', status={self.rsvp_status}, waitlist={self.waitlist_position})>"
     
@@ -3,17 +3,34 @@ Export Service - CSV export functionality.
 Exports all player data with timestamps for record keeping.
 """
 
+import csv
 import io
-from datetime import datetime
-import pandas as pd
-from sqlalchemy.orm import Session
+import time
+from typing import AsyncIterator
+from sqlalchemy import String, and_, case, cast, func, literal, select
+from database import SessionLocal
 from models import Player
 
+# CSV column headers, in output order
+CSV_HEADERS = [
+    "ID",
+    "Name",
+    "RSVP Status",
+    "Display Status",
+    "RSVP Timestamp",
+    "Waitlist Position",
+    "Paid",
+    "Checked In",
+]
 
-def export_players_to_csv(db: Session) -> str:
+
+async def iter_players_csv() -> AsyncIterator[str]:
     """
-    Export all players to CSV format.
-    
+    Stream all players as CSV, one chunk per row.
+
+    Opens its own session: request-scoped sessions are torn down before a
+    streaming body runs, so the generator must manage its own.
+
     Includes:
     - Player name
     - RSVP status
@@ -21,62 +38,74 @@ def export_players_to_csv(db: Session) -> str:
     - Waitlist position
     - Payment status
     - Check-in status
-    
-    Returns:
-        str: CSV content as string
+
+    Yields:
+        str: CSV header, then one CSV line per player
     """
-    # Query all players
-    players = db.query(Player).order_by(
-        Player.rsvp_status.desc(),  # IN first, then OUT
-        Player.waitlist_position.asc().nullsfirst(),  # Confirmed first, then waitlist
-        Player.rsvp_timestamp.asc()  # Then by timestamp
-    ).all()
-    
-    # Convert to list of dictionaries
-    data = []
-    for player in players:
-        # Determine display status
-        if player.rsvp_status == "OUT":
-            display_status = "OUT"
-        elif player.waitlist_position is None:
-            display_status = "CONFIRMED"
-        else:
-            display_status = f"WAITLIST #{player.waitlist_position}"
-        
-        data.append({
-            "ID": player.id,
-            "Name": player.name,
-            "RSVP Status": player.rsvp_status,
-            "Display Status": display_status,
-            "RSVP Timestamp": player.rsvp_timestamp.strftime("%Y-%m-%d %H:%M:%S") if player.rsvp_timestamp else "",
-            "Waitlist Position": player.waitlist_position if player.waitlist_position else "",
-            "Paid": "YES" if player.paid else "NO",
-            "Checked In": "YES" if player.checked_in else "NO"
-        })
-    
-    # Create DataFrame and convert to CSV
-    df = pd.DataFrame(data)
-    
-    return df.to_csv(index=False)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
 
+    writer.writerow(CSV_HEADERS)
+    yield buffer.getvalue()
 
-def export_players_to_csv_bytes(db: Session) -> bytes:
-    """
-    Export players to CSV as bytes (for file download).
-    
-    Returns:
-        bytes: CSV content as UTF-8 encoded bytes
-    """
-    csv_content = export_players_to_csv(db)
-    return csv_content.encode('utf-8')
+    # Derived columns computed in SQL during the scan: the waitlist rank
+    # is ROW_NUMBER over RSVP-timestamp order within the waitlisted
+    # partition, and display status is a CASE over it - no per-row
+    # Python branching and no separate rank query
+    is_waitlisted = and_(Player.rsvp_status == "IN", Player.waitlist_position.isnot(None))
+    rank = func.row_number().over(
+        partition_by=is_waitlisted,
+        order_by=Player.rsvp_timestamp.asc()
+    )
+    waitlist_rank = case((is_waitlisted, rank), else_=None).label("waitlist_rank")
+    display_status = case(
+        (Player.rsvp_status == "OUT", "OUT"),
+        (Player.waitlist_position.is_(None), "CONFIRMED"),
+        else_=literal("WAITLIST #") + cast(rank, String)
+    ).label("display_status")
+
+    async with SessionLocal() as db:
+        # Plain column tuples streamed in batches - no ORM hydration and
+        # peak memory stays constant however large the table grows
+        stmt = select(
+            Player.id,
+            Player.name,
+            Player.rsvp_status,
+            display_status,
+            Player.rsvp_timestamp,
+            waitlist_rank,
+            Player.paid,
+            Player.checked_in,
+        ).order_by(
+            Player.rsvp_status.desc(),  # IN first, then OUT
+            Player.waitlist_position.asc().nullsfirst(),  # Confirmed first, then waitlist
+            Player.rsvp_timestamp.asc()  # Then by timestamp
+        ).execution_options(yield_per=500)
+
+        result = await db.stream(stmt)
+
+        async for row in result:
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerow([
+                row.id,
+                row.name,
+                row.rsvp_status,
+                row.display_status,
+                row.rsvp_timestamp.strftime("%Y-%m-%d %H:%M:%S") if row.rsvp_timestamp else "",
+                row.waitlist_rank if row.waitlist_rank is not None else "",
+                "YES" if row.paid else "NO",
+                "YES" if row.checked_in else "NO",
+            ])
+            yield buffer.getvalue()
 
 
 def get_export_filename() -> str:
     """
     Generate a filename for the CSV export.
-    
+
     Returns:
         str: Filename with timestamp
     """
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return f"rsvp_export_{timestamp}.csv"
+    # time.strftime skips datetime object construction entirely
+    return f"rsvp_export_{time.strftime('%Y%m%d_%H%M%S')}.csv"
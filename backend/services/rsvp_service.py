@@ -4,115 +4,150 @@ Handles IN/OUT voting with 22-player limit and waitlist management.
 """
 
 from datetime import datetime, timezone
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 from models import Player
 
 # Maximum players allowed in the confirmed list
 MAX_CONFIRMED_PLAYERS = 22
 
 
-def get_confirmed_count(db: Session) -> int:
-    """Count players who are IN and NOT on waitlist"""
-    return db.query(Player).filter(
-        Player.rsvp_status == "IN",
-        Player.waitlist_position.is_(None)
-    ).count()
+async def get_waitlist_rank(db: AsyncSession, player: Player) -> int:
+    """Compute a waitlisted player's display position (1-based, by RSVP time)"""
+    result = await db.execute(
+        select(func.count()).select_from(Player).where(
+            Player.rsvp_status == "IN",
+            Player.waitlist_position.isnot(None),
+            Player.rsvp_timestamp <= player.rsvp_timestamp
+        )
+    )
+    return result.scalar_one()
 
 
-def get_next_waitlist_position(db: Session) -> int:
-    """Get the next available waitlist position"""
-    max_pos = db.query(func.max(Player.waitlist_position)).scalar()
-    return (max_pos or 0) + 1
+async def overlay_waitlist_rank(db: AsyncSession, player: Player) -> Player:
+    """
+    Replace the sparse stored waitlist marker on a loaded player with the
+    derived display rank, so single-player responses never leak the raw
+    column. No-op for confirmed and OUT players.
+    """
+    if player.rsvp_status == "IN" and player.waitlist_position is not None:
+        rank = await get_waitlist_rank(db, player)
+        set_committed_value(player, "waitlist_position", rank)
+    return player
 
 
-def get_player_by_name(db: Session, name: str) -> Player | None:
-    """Find a player by name (case-insensitive)"""
-    return db.query(Player).filter(
-        func.lower(Player.name) == func.lower(name)
-    ).first()
+async def get_player_by_name(db: AsyncSession, name: str) -> Player | None:
+    """Find a player by name (case-insensitive, via the name_lower index)"""
+    result = await db.execute(
+        select(Player).where(Player.name_lower == name.strip().lower())
+    )
+    return result.scalars().first()
 
 
-def get_player_by_id(db: Session, player_id: int) -> Player | None:
+async def get_player_by_id(db: AsyncSession, player_id: int) -> Player | None:
     """Find a player by ID"""
-    return db.query(Player).filter(Player.id == player_id).first()
+    result = await db.execute(select(Player).where(Player.id == player_id))
+    return result.scalar_one_or_none()
 
 
-def rsvp_in(db: Session, player_name: str) -> tuple[Player, str]:
+async def rsvp_in(db: AsyncSession, player_name: str) -> tuple[Player | None, str]:
     """
     RSVP a player IN.
-    
+
     Rules:
     - If under 22 confirmed players: add to confirmed list
     - If 22+ confirmed players: add to waitlist with timestamp-based position
-    
+
     Returns:
-        tuple: (Player object, status message)
+        tuple: (Player object, status message); the player is None when
+        the RSVP was a no-op (already IN) - the caller already has the
+        player's state, so there is nothing new to echo back
     """
     timestamp = datetime.now(timezone.utc)
-    
+
     # Check if player already exists
-    player = get_player_by_name(db, player_name)
-    
+    player = await get_player_by_name(db, player_name)
+
     if player:
         # Player exists - update their status
         if player.rsvp_status == "IN":
             if player.waitlist_position is None:
-                return player, "Already confirmed IN"
+                return None, "Already confirmed IN"
             else:
-                return player, f"Already on waitlist at position {player.waitlist_position}"
-        
+                position = await get_waitlist_rank(db, player)
+                return None, f"Already on waitlist at position {position}"
+
         # Player was OUT, now going IN
         player.rsvp_status = "IN"
         player.rsvp_timestamp = timestamp
         player.paid = False
         player.checked_in = False
-        
+
     else:
         # Create new player
         player = Player(
             name=player_name.strip(),
+            name_lower=player_name.strip().lower(),
             rsvp_status="IN",
             rsvp_timestamp=timestamp,
             paid=False,
             checked_in=False
         )
         db.add(player)
-    
-    # Determine if confirmed or waitlisted
-    confirmed_count = get_confirmed_count(db)
-    
+
+    # Determine if confirmed or waitlisted - one aggregate query returns
+    # the confirmed count, the waitlist size, and the next sparse marker
+    stats = (await db.execute(
+        select(
+            func.sum(case((Player.waitlist_position.is_(None), 1), else_=0)),
+            func.count(),
+            func.max(Player.waitlist_position)
+        ).where(Player.rsvp_status == "IN")
+    )).one()
+    confirmed_count = stats[0] or 0
+    waitlist_count = (stats[1] or 0) - confirmed_count
+    max_waitlist_position = stats[2] or 0
+
     if confirmed_count < MAX_CONFIRMED_PLAYERS:
         player.waitlist_position = None
         message = f"Confirmed IN! ({confirmed_count + 1}/{MAX_CONFIRMED_PLAYERS} spots filled)"
+        display_rank = None
     else:
-        player.waitlist_position = get_next_waitlist_position(db)
-        message = f"Added to waitlist at position {player.waitlist_position}"
-    
-    db.commit()
-    db.refresh(player)
-    
+        # Sparse marker - never renumbered; display rank comes from
+        # ROW_NUMBER over rsvp_timestamp on read
+        player.waitlist_position = max_waitlist_position + 1
+        display_rank = waitlist_count + 1
+        message = f"Added to waitlist at position {display_rank}"
+
+    await db.commit()
+
+    if display_rank is not None:
+        # Echo the derived rank, not the stored sparse marker
+        set_committed_value(player, "waitlist_position", display_rank)
+
     return player, message
 
 
-def rsvp_out(db: Session, player_name: str) -> tuple[Player | None, str]:
+async def rsvp_out(db: AsyncSession, player_name: str) -> tuple[Player | None, str]:
     """
     RSVP a player OUT.
-    
+
     Rules:
     - Set status to OUT
     - Clear waitlist position
     - If player was confirmed, promote next waitlisted player
-    
+
     Returns:
         tuple: (Player object or None, status message)
     """
-    player = get_player_by_name(db, player_name)
-    
+    player = await get_player_by_name(db, player_name)
+
     if not player:
         # Create new player as OUT
         player = Player(
             name=player_name.strip(),
+            name_lower=player_name.strip().lower(),
             rsvp_status="OUT",
             rsvp_timestamp=datetime.now(timezone.utc),
             paid=False,
@@ -120,95 +155,93 @@ def rsvp_out(db: Session, player_name: str) -> tuple[Player | None, str]:
             waitlist_position=None
         )
         db.add(player)
-        db.commit()
-        db.refresh(player)
+        await db.commit()
         return player, "Marked as OUT"
-    
+
     was_confirmed = player.is_confirmed
-    
+
     # Update player status
     player.rsvp_status = "OUT"
     player.waitlist_position = None
     player.paid = False
     player.checked_in = False
-    
-    db.commit()
-    
-    # If player was confirmed, promote from waitlist
-    if was_confirmed:
-        promoted = promote_from_waitlist(db)
-        if promoted:
-            db.refresh(player)
-            return player, f"Marked as OUT. {promoted.name} promoted from waitlist!"
-    
-    db.refresh(player)
+
+    # If player was confirmed, promote from waitlist in the same transaction
+    promoted = await promote_from_waitlist(db) if was_confirmed else None
+
+    await db.commit()
+
+    if promoted:
+        return player, f"Marked as OUT. {promoted.name} promoted from waitlist!"
+
     return player, "Marked as OUT"
 
 
-def promote_from_waitlist(db: Session) -> Player | None:
+async def promote_from_waitlist(db: AsyncSession) -> Player | None:
     """
     Promote the first player from waitlist to confirmed.
-    Called when a confirmed player goes OUT.
-    
+    Called when a confirmed player goes OUT or is deleted.
+
+    Does not commit - the caller folds the promotion into its own
+    transaction so the whole operation costs a single commit.
+
     Returns:
         Player: The promoted player, or None if waitlist is empty
     """
-    # Get the player with the lowest waitlist position
-    next_player = db.query(Player).filter(
-        Player.rsvp_status == "IN",
-        Player.waitlist_position.isnot(None)
-    ).order_by(Player.waitlist_position.asc()).first()
-    
+    # Get the longest-waiting player (RSVP timestamp is the waitlist order)
+    result = await db.execute(
+        select(Player).where(
+            Player.rsvp_status == "IN",
+            Player.waitlist_position.isnot(None)
+        ).order_by(Player.rsvp_timestamp.asc())
+    )
+    next_player = result.scalars().first()
+
     if next_player:
+        # No renumbering needed - remaining display positions are
+        # computed from rsvp_timestamp on read
         next_player.waitlist_position = None
-        db.commit()
-        
-        # Recalculate waitlist positions
-        recalculate_waitlist_positions(db)
-        
-        db.refresh(next_player)
         return next_player
-    
+
     return None
 
 
-def recalculate_waitlist_positions(db: Session):
-    """
-    Recalculate waitlist positions after a promotion.
-    Ensures positions are sequential: 1, 2, 3...
-    """
-    waitlisted = db.query(Player).filter(
-        Player.rsvp_status == "IN",
-        Player.waitlist_position.isnot(None)
-    ).order_by(Player.rsvp_timestamp.asc()).all()
-    
-    for i, player in enumerate(waitlisted, start=1):
-        player.waitlist_position = i
-    
-    db.commit()
-
-
-def get_all_players_categorized(db: Session) -> dict:
+async def get_all_players_categorized(db: AsyncSession) -> dict:
     """
     Get all players categorized by status.
-    
+
     Returns:
         dict with confirmed, waitlist, and out lists
     """
-    confirmed = db.query(Player).filter(
-        Player.rsvp_status == "IN",
-        Player.waitlist_position.is_(None)
-    ).order_by(Player.rsvp_timestamp.asc()).all()
-    
-    waitlist = db.query(Player).filter(
-        Player.rsvp_status == "IN",
-        Player.waitlist_position.isnot(None)
-    ).order_by(Player.waitlist_position.asc()).all()
-    
-    out = db.query(Player).filter(
-        Player.rsvp_status == "OUT"
-    ).order_by(Player.name.asc()).all()
-    
+    result = await db.execute(
+        select(Player).where(
+            Player.rsvp_status == "IN",
+            Player.waitlist_position.is_(None)
+        ).order_by(Player.rsvp_timestamp.asc())
+    )
+    confirmed = result.scalars().all()
+
+    result = await db.execute(
+        select(
+            Player,
+            func.row_number().over(order_by=Player.rsvp_timestamp.asc()).label("position")
+        ).where(
+            Player.rsvp_status == "IN",
+            Player.waitlist_position.isnot(None)
+        ).order_by(Player.rsvp_timestamp.asc())
+    )
+    waitlist = []
+    for player, position in result.all():
+        # Display position is derived, not stored - overlay it without
+        # dirtying the session
+        set_committed_value(player, "waitlist_position", position)
+        waitlist.append(player)
+
+    result = await db.execute(
+        select(Player).where(Player.rsvp_status == "OUT").order_by(Player.name.asc())
+    )
+    out = result.scalars().all()
+
     return {
         "confirmed": confirmed,
         "waitlist": waitlist,